@@ -3,13 +3,38 @@ Flask Backend for AI-Powered Rural Microgrid System
 Main application file
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import config
 from services.weather_service import get_weather_features
 from services.prediction_service import initialize_prediction_service, get_predictions
 from services.dispatch_service import get_dispatch_decision
-from utils.validators import validate_city_parameter, create_error_response
+from services.location_service import resolve_city
+from services.admission_service import (
+    admission_controlled,
+    stream_admission_controlled,
+    get_admission_metrics
+)
+from services.stream_service import (
+    build_prediction_response,
+    parse_stream_cities,
+    stream_fleet_predictions
+)
+from services.profiling_service import (
+    traceable,
+    trace_stage,
+    capture_stack_samples,
+    format_collapsed,
+    register_request_thread,
+    unregister_request_thread
+)
+from utils.validators import (
+    validate_city_parameter,
+    validate_city_list,
+    validate_admin_token,
+    validate_profile_parameters,
+    create_error_response
+)
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -20,6 +45,18 @@ CORS(app)
 # No global state needed - simplified dispatch
 
 
+@app.before_request
+def track_request_thread():
+    """Register the serving thread so sampling profiles can find it"""
+    register_request_thread()
+
+
+@app.teardown_request
+def untrack_request_thread(error=None):
+    """Unregister the serving thread once the request is done"""
+    unregister_request_thread()
+
+
 @app.route("/", methods=["GET"])
 def home():
     """Health check endpoint"""
@@ -28,18 +65,24 @@ def home():
         "service": "AI-Powered Rural Microgrid Backend",
         "version": "1.0.0",
         "endpoints": {
-            "/predict": "GET - Get energy predictions for a city (simplified - no battery)"
+            "/predict": "GET - Get energy predictions for a city (simplified - no battery)",
+            "/predict/stream": "GET - Stream predictions for many cities as NDJSON or SSE",
+            "/metrics/admission": "GET - Admission control and rate limiter state",
+            "/admin/profile": "GET - Sampling profile of live requests (admin token required)"
         }
     }), 200
 
 
 @app.route("/predict", methods=["GET"])
+@admission_controlled
+@traceable
 def predict():
     """
     Main prediction endpoint
     
     Query Parameters:
         city (str): Name of the city
+        trace (str): Optional 'stages' or 'pstats' (admin token required)
         
     Returns:
         JSON: {
@@ -50,7 +93,8 @@ def predict():
             "wind_used": float,
             "grid_import": float,
             "grid_export": float,
-            "weather": dict
+            "weather": dict,
+            "trace": dict        # only when tracing
         }
     """
 
@@ -67,13 +111,27 @@ def predict():
                 400
             )
         
+        # Resolve to a canonical location before any upstream call
+        location, error_response = resolve_city(city)
+        if location is None:
+            return create_error_response(
+                error_response["error"],
+                error_response["message"],
+                400
+            )
+        
         print(f"\n{'='*60}")
-        print(f"Processing prediction request for city: {city}")
+        print(f"Processing prediction request for city: {city} -> {location['name']} ({location['id']}, {location['match']})")
         print(f"{'='*60}")
         
         # Step 2: Fetch weather data
         print("\n[1/4] Fetching weather data...")
-        weather_data = get_weather_features(city)
+        with trace_stage("weather"):
+            weather_data = get_weather_features(
+                location["name"],
+                query=location["query"],
+                location_id=location["id"]
+            )
         print(f"[OK] Weather data retrieved from API:")
         print(f"  - Temperature: {weather_data['temperature']}°C")
         print(f"  - Wind Speed: {weather_data['wind_speed']} kph")
@@ -85,7 +143,8 @@ def predict():
         
         # Step 3: Get predictions from ML models
         print("\n[2/4] Generating predictions...")
-        predictions = get_predictions(weather_data)
+        with trace_stage("predict_all"):
+            predictions = get_predictions(weather_data)
         print(f"[OK] Predictions generated:")
         print(f"  - Load: {predictions['predicted_load']:.2f} kW")
         print(f"  - Solar: {predictions['predicted_solar']:.2f} kW")
@@ -94,11 +153,12 @@ def predict():
         # Step 4: Run dispatch engine (simplified - no battery)
         print(f"\n[3/4] Running dispatch engine...")
         
-        dispatch_result = get_dispatch_decision(
-            predicted_load=predictions["predicted_load"],
-            predicted_solar=predictions["predicted_solar"],
-            predicted_wind=predictions["predicted_wind"]
-        )
+        with trace_stage("dispatch"):
+            dispatch_result = get_dispatch_decision(
+                predicted_load=predictions["predicted_load"],
+                predicted_solar=predictions["predicted_solar"],
+                predicted_wind=predictions["predicted_wind"]
+            )
         
         print(f"[OK] Dispatch decision:")
         print(f"  - Solar Used: {dispatch_result['solar_used']:.2f} kW")
@@ -108,26 +168,7 @@ def predict():
         
         # Step 5: Build response
         print("\n[4/4] Building response...")
-        response = {
-            "predicted_load": round(predictions["predicted_load"], 2),
-            "predicted_solar": round(predictions["predicted_solar"], 2),
-            "predicted_wind": round(predictions["predicted_wind"], 2),
-            "solar_used": dispatch_result["solar_used"],
-            "wind_used": dispatch_result["wind_used"],
-            "grid_import": dispatch_result["grid_import"],
-            "grid_export": dispatch_result["grid_export"],
-            
-            # Weather Data
-            "weather": {
-                "temperature": weather_data.get("temperature"),
-                "wind_speed": weather_data.get("wind_speed"),
-                "humidity": weather_data.get("humidity"),
-                "pressure": weather_data.get("atmospheric_pressure"),
-                "solar_radiance": weather_data.get("solar_irradiance"),
-                "cloud_cover": weather_data.get("cloud", 0),
-                "city": weather_data.get("city"),
-            }
-        }
+        response = build_prediction_response(weather_data, predictions, dispatch_result)
         
         print(f"[OK] Response ready")
         print(f"{'='*60}\n")
@@ -145,6 +186,116 @@ def predict():
         )
 
 
+@app.route("/predict/stream", methods=["GET"])
+@stream_admission_controlled
+def predict_stream():
+    """
+    Streaming fleet prediction endpoint
+    
+    Emits one record per city as soon as its prediction and dispatch
+    decision are ready, followed by a summary record.
+    
+    Query Parameters:
+        cities (str): Comma-separated city names (may be repeated)
+        city (str): Single city name, may contain ", state" (may be repeated)
+        format (str): 'ndjson' (default) or 'sse'
+        
+    Returns:
+        Streamed response (application/x-ndjson or text/event-stream)
+    """
+    cities = parse_stream_cities(request.args)
+    
+    is_valid, error_response = validate_city_list(cities)
+    if not is_valid:
+        return create_error_response(
+            error_response["error"],
+            error_response["message"],
+            400
+        )
+    
+    fmt = request.args.get("format", "ndjson").strip().lower()
+    if fmt not in ("ndjson", "sse"):
+        return create_error_response(
+            "Invalid parameter value",
+            "Format must be 'ndjson' or 'sse'",
+            400
+        )
+    
+    print(f"Streaming predictions for {len(cities)} cities ({fmt})")
+    
+    mimetype = "text/event-stream" if fmt == "sse" else "application/x-ndjson"
+    return Response(
+        stream_fleet_predictions(cities, fmt=fmt),
+        mimetype=mimetype,
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Disable proxy buffering (nginx)
+        }
+    )
+
+
+@app.route("/metrics/admission", methods=["GET"])
+def admission_metrics():
+    """Admission control and per-client rate limiter state"""
+    return jsonify(get_admission_metrics()), 200
+
+
+@app.route("/admin/profile", methods=["GET"])
+def admin_profile():
+    """
+    Capture a time-bounded sampling profile of live requests
+    
+    Headers:
+        X-Admin-Token (str): Must match ADMIN_TOKEN
+        
+    Query Parameters:
+        seconds (float): Capture duration (default 10)
+        interval_ms (float): Sampling interval (default 10)
+        threads (str): 'requests' (default) or 'all'
+        
+    Returns:
+        text/plain: Collapsed stacks ('frame;frame count' per line) for flamegraphs
+    """
+    is_valid, error_response = validate_admin_token(request.headers.get(config.ADMIN_TOKEN_HEADER))
+    if not is_valid:
+        return create_error_response(
+            error_response["error"],
+            error_response["message"],
+            403
+        )
+    
+    seconds = request.args.get("seconds", "10")
+    interval_ms = request.args.get("interval_ms", "10")
+    is_valid, error_response = validate_profile_parameters(seconds, interval_ms)
+    if not is_valid:
+        return create_error_response(
+            error_response["error"],
+            error_response["message"],
+            400
+        )
+    
+    # The capturing thread is not a live request itself
+    unregister_request_thread()
+    
+    try:
+        profile = capture_stack_samples(
+            seconds=float(seconds),
+            interval=float(interval_ms) / 1000.0,
+            all_threads=request.args.get("threads", "requests") == "all"
+        )
+    except Exception as e:
+        return create_error_response("Conflict", str(e), 409)
+    
+    print(f"[OK] Profile captured: {profile['samples']} samples over {profile['duration_s']}s")
+    
+    return Response(
+        format_collapsed(profile["stacks"]),
+        mimetype="text/plain",
+        headers={
+            "X-Profile-Samples": str(profile["samples"]),
+            "X-Profile-Duration": str(profile["duration_s"])
+        }
+    )
 
 
 @app.errorhandler(404)
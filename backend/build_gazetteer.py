@@ -0,0 +1,210 @@
+"""
+Gazetteer Builder
+Converts a GeoNames country dump into the gazetteer CSV used for offline
+city resolution, so strict mode can cover every served town and village
+
+Usage:
+    # https://download.geonames.org/export/dump/IN.zip and admin1CodesASCII.txt
+    python build_gazetteer.py IN.txt --admin1 admin1CodesASCII.txt
+    python build_gazetteer.py IN.txt --admin1 admin1CodesASCII.txt --min-population 500
+    python build_gazetteer.py IN.txt --admin1 admin1CodesASCII.txt --output data/gazetteer_full.csv
+"""
+
+import argparse
+import csv
+import os
+import sys
+
+from services.location_service import normalize_name
+
+
+# State codes used in gazetteer IDs (IN-<code>-<NAME>), keyed by normalized
+# state name; older GeoNames spellings map to the current state
+STATE_CODES = {
+    "andaman and nicobar islands": ("AN", "Andaman and Nicobar Islands"),
+    "andhra pradesh": ("AP", "Andhra Pradesh"),
+    "arunachal pradesh": ("AR", "Arunachal Pradesh"),
+    "assam": ("AS", "Assam"),
+    "bihar": ("BR", "Bihar"),
+    "chandigarh": ("CH", "Chandigarh"),
+    "chhattisgarh": ("CG", "Chhattisgarh"),
+    "dadra and nagar haveli and daman and diu": ("DH", "Dadra and Nagar Haveli and Daman and Diu"),
+    "dadra and nagar haveli": ("DH", "Dadra and Nagar Haveli and Daman and Diu"),
+    "daman and diu": ("DH", "Dadra and Nagar Haveli and Daman and Diu"),
+    "delhi": ("DL", "Delhi"),
+    "goa": ("GA", "Goa"),
+    "gujarat": ("GJ", "Gujarat"),
+    "haryana": ("HR", "Haryana"),
+    "himachal pradesh": ("HP", "Himachal Pradesh"),
+    "jammu and kashmir": ("JK", "Jammu and Kashmir"),
+    "jharkhand": ("JH", "Jharkhand"),
+    "karnataka": ("KA", "Karnataka"),
+    "kerala": ("KL", "Kerala"),
+    "ladakh": ("LA", "Ladakh"),
+    "lakshadweep": ("LD", "Lakshadweep"),
+    "madhya pradesh": ("MP", "Madhya Pradesh"),
+    "maharashtra": ("MH", "Maharashtra"),
+    "manipur": ("MN", "Manipur"),
+    "meghalaya": ("ML", "Meghalaya"),
+    "mizoram": ("MZ", "Mizoram"),
+    "nagaland": ("NL", "Nagaland"),
+    "odisha": ("OD", "Odisha"),
+    "orissa": ("OD", "Odisha"),
+    "puducherry": ("PY", "Puducherry"),
+    "pondicherry": ("PY", "Puducherry"),
+    "punjab": ("PB", "Punjab"),
+    "rajasthan": ("RJ", "Rajasthan"),
+    "sikkim": ("SK", "Sikkim"),
+    "tamil nadu": ("TN", "Tamil Nadu"),
+    "telangana": ("TG", "Telangana"),
+    "tripura": ("TR", "Tripura"),
+    "uttar pradesh": ("UP", "Uttar Pradesh"),
+    "uttarakhand": ("UK", "Uttarakhand"),
+    "uttaranchal": ("UK", "Uttarakhand"),
+    "west bengal": ("WB", "West Bengal")
+}
+
+# GeoNames dump column positions (tab separated, no header)
+COL_ID = 0
+COL_NAME = 1
+COL_ASCII_NAME = 2
+COL_ALTERNATE_NAMES = 3
+COL_LAT = 4
+COL_LON = 5
+COL_FEATURE_CLASS = 6
+COL_COUNTRY = 8
+COL_ADMIN1 = 10
+COL_POPULATION = 14
+
+
+def load_admin1(path: str, country: str) -> dict:
+    """
+    Map GeoNames admin1 codes to (state code, state name)
+
+    Args:
+        path (str): admin1CodesASCII.txt
+        country (str): ISO country code, e.g. "IN"
+
+    Returns:
+        dict: {"16": ("MH", "Maharashtra"), ...}
+    """
+    states = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 3 or not fields[0].startswith(f"{country}."):
+                continue
+            admin1 = fields[0].split(".", 1)[1]
+            ascii_name = fields[2]
+            key = normalize_name(ascii_name)
+            # "National Capital Territory of Delhi" and similar long forms
+            match = STATE_CODES.get(key) or next(
+                (value for name, value in STATE_CODES.items() if f" {name} " in f" {key} "),
+                (admin1, ascii_name)
+            )
+            states[admin1] = match
+    return states
+
+
+def iter_places(path: str, states: dict, country: str, min_population: int, max_aliases: int):
+    """
+    Yield gazetteer rows for populated places in a GeoNames dump
+
+    Aliases are the alternate names that normalize to a distinct ASCII
+    key; names in other scripts cannot be typed into the city parameter
+    and would only bloat the file.
+
+    Yields:
+        dict: {"geonameid", "name", "state", "state_code", "lat", "lon", "aliases"}
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) <= COL_POPULATION:
+                continue
+            if fields[COL_FEATURE_CLASS] != "P" or fields[COL_COUNTRY] != country:
+                continue
+            if int(fields[COL_POPULATION] or 0) < min_population:
+                continue
+
+            state_code, state = states.get(fields[COL_ADMIN1], (fields[COL_ADMIN1] or "XX", ""))
+            name = fields[COL_ASCII_NAME] or fields[COL_NAME]
+
+            seen = {normalize_name(name)}
+            aliases = []
+            for alias in [fields[COL_NAME]] + fields[COL_ALTERNATE_NAMES].split(","):
+                key = normalize_name(alias)
+                if key and key not in seen and len(aliases) < max_aliases:
+                    seen.add(key)
+                    aliases.append(alias.strip().replace("|", " "))
+
+            yield {
+                "geonameid": fields[COL_ID],
+                "name": name,
+                "state": state,
+                "state_code": state_code,
+                "lat": round(float(fields[COL_LAT]), 4),
+                "lon": round(float(fields[COL_LON]), 4),
+                "aliases": "|".join(aliases)
+            }
+
+
+def write_gazetteer(places, path: str, country: str) -> int:
+    """
+    Write rows in the gazetteer CSV format (id, name, state, lat, lon, aliases)
+
+    IDs follow the bundled file (IN-MH-PUNE); a second place with the same
+    name in the same state gets its GeoNames ID appended.
+
+    Returns:
+        int: Number of rows written
+    """
+    used_ids = set()
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "state", "lat", "lon", "aliases"])
+        for place in places:
+            slug = "".join(c for c in normalize_name(place["name"]).upper() if c.isalnum())
+            location_id = f"{country}-{place['state_code']}-{slug}"
+            if location_id in used_ids:
+                location_id = f"{location_id}-{place['geonameid']}"
+            used_ids.add(location_id)
+
+            writer.writerow([
+                location_id,
+                place["name"],
+                place["state"],
+                place["lat"],
+                place["lon"],
+                place["aliases"]
+            ])
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the city gazetteer from a GeoNames dump")
+    parser.add_argument("geonames", help="GeoNames country dump, e.g. IN.txt")
+    parser.add_argument("--admin1", required=True, help="GeoNames admin1CodesASCII.txt")
+    parser.add_argument("--country", default="IN")
+    parser.add_argument("--output", default=os.path.join("data", "gazetteer.csv"))
+    parser.add_argument("--min-population", type=int, default=0,
+                        help="Skip places with a smaller recorded population (0 keeps all)")
+    parser.add_argument("--max-aliases", type=int, default=10)
+    args = parser.parse_args()
+
+    try:
+        states = load_admin1(args.admin1, args.country)
+        places = iter_places(args.geonames, states, args.country,
+                             args.min_population, args.max_aliases)
+        count = write_gazetteer(places, args.output, args.country)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+
+    print(f"[OK] Wrote {count} places to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
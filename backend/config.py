@@ -3,16 +3,48 @@ Configuration file for Rural Microgrid Backend
 Stores all constants and API keys
 """
 
+import os
+
 # WeatherAPI Configuration
-WEATHER_API_KEY = "dfb6aec282054230a2a130500261202"  # Replace with actual API key
-WEATHER_API_URL = "http://api.weatherapi.com/v1/current.json"
+# Both can be overridden via environment (e.g. to point at a local stub for load tests)
+WEATHER_API_KEY = os.getenv("WEATHER_API_KEY", "dfb6aec282054230a2a130500261202")  # Replace with actual API key
+WEATHER_API_URL = os.getenv("WEATHER_API_URL", "http://api.weatherapi.com/v1/current.json")
 
 # Model Paths
 GRID_LOAD_MODEL_PATH = "models/grid_load_demand_model.pkl"
 SOLAR_MODEL_PATH = "models/solar_model.pkl"
 WIND_MODEL_PATH = "models/wind_model.pkl"
 
+# City Resolution (offline gazetteer)
+# The bundled gazetteer only covers ~90 major cities; build a village-level one from
+# GeoNames with build_gazetteer.py before enabling strict mode
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", "data/gazetteer.csv")
+CITY_SUGGEST_CUTOFF = 0.6                                           # Min similarity for "did you mean" suggestions
+CITY_RESOLUTION_STRICT = os.getenv("CITY_RESOLUTION_STRICT", "0") == "1"  # Reject names not in the gazetteer
+
 # Flask Configuration
+# Namespaced env vars: shells such as tcsh export HOST=<hostname>
 DEBUG = False
-HOST = "127.0.0.1"
-PORT = 5000
+HOST = os.getenv("MICROGRID_HOST", "127.0.0.1")
+PORT = int(os.getenv("MICROGRID_PORT", "5000"))
+
+# Streaming Configuration (/predict/stream)
+STREAM_MAX_WORKERS = 8     # Max cities processed concurrently per stream
+STREAM_MAX_CITIES = 500    # Max cities accepted in a single stream request
+
+# Admission Control (/predict, /predict/stream)
+MAX_IN_FLIGHT = int(os.getenv("MAX_IN_FLIGHT", "32"))            # Concurrent /predict requests before 503 shedding
+MAX_STREAMS_IN_FLIGHT = int(os.getenv("MAX_STREAMS_IN_FLIGHT", "4"))  # Concurrent streams (each runs STREAM_MAX_WORKERS calls)
+RATE_LIMIT_RPS = float(os.getenv("RATE_LIMIT_RPS", "5"))         # Sustained requests/s per client (0 disables)
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "20"))      # Token bucket capacity per client
+RATE_LIMIT_KEY_HEADER = "X-API-Key"                              # Header identifying a client (falls back to IP)
+RATE_LIMIT_API_KEYS = {                                          # Keys honoured by the limiter; others are keyed by IP
+    key.strip() for key in os.getenv("RATE_LIMIT_API_KEYS", "").split(",") if key.strip()
+}
+TRUST_FORWARDED_FOR = os.getenv("TRUST_FORWARDED_FOR", "0") == "1"  # Behind exactly one trusted proxy
+
+# Profiling (/admin/profile, /predict?trace=...)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")                          # Empty disables admin endpoints
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")                  # Where per-request .pstats files go
+PROFILE_MAX_SECONDS = 60                                            # Longest allowed sampling capture
@@ -0,0 +1,480 @@
+"""
+Load Testing Harness
+Drives the Flask backend at increasing concurrency against a local
+WeatherAPI stub so capacity can be measured fully offline
+
+Usage:
+    python load_test.py
+    python load_test.py --concurrency 1,4,16,64 --duration 15
+    python load_test.py --stub-latency-ms 300 --stub-error-rate 0.05
+    python load_test.py --endpoint stream --stream-cities 50
+    python load_test.py --server-cmd "gunicorn -w 4 -b {host}:{port} app:app"
+    python load_test.py --stub-only        # serve the stub for a separately started backend
+    python load_test.py --target http://127.0.0.1:5000 --no-stub
+    python load_test.py --keep-limits      # measure with admission control enabled
+"""
+
+import argparse
+import json
+import os
+import random
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import requests
+
+
+# Backend settings that disable admission control so the sweep measures
+# serving capacity rather than the rate limiter (see --keep-limits)
+UNLIMITED_ADMISSION_ENV = {
+    "RATE_LIMIT_RPS": "0",
+    "MAX_IN_FLIGHT": "1000000",
+    "MAX_STREAMS_IN_FLIGHT": "1000000"
+}
+
+DEFAULT_CITIES = [
+    "Delhi", "Mumbai", "Pune", "Chennai", "Kolkata", "Bengaluru",
+    "Hyderabad", "Jaipur", "Lucknow", "Nagpur", "Indore", "Bhopal"
+]
+
+
+# ---------------------------------------------------------------------------
+# WeatherAPI stub
+# ---------------------------------------------------------------------------
+
+class WeatherStubHandler(BaseHTTPRequestHandler):
+    """Serves /v1/current.json responses shaped like WeatherAPI"""
+
+    # Overridden per server via make_weather_stub()
+    latency_ms = 0.0
+    jitter_ms = 0.0
+    error_rate = 0.0
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        city = parse_qs(url.query).get("q", ["Unknown"])[0]
+
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+        if random.random() < self.error_rate:
+            self._send_json(500, {"error": {"code": 9999, "message": "Stub injected error"}})
+            return
+
+        self._send_json(200, {
+            "location": {"name": city},
+            "current": {
+                "temp_c": round(random.uniform(15, 40), 1),
+                "wind_kph": round(random.uniform(0, 40), 1),
+                "humidity": random.randint(20, 90),
+                "cloud": random.randint(0, 100),
+                "pressure_mb": round(random.uniform(995, 1020), 1),
+                "uv": round(random.uniform(0, 10), 1)
+            }
+        })
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep load test output readable
+        pass
+
+
+def make_weather_stub(host: str, port: int, latency_ms: float, jitter_ms: float, error_rate: float):
+    """
+    Start the WeatherAPI stub in a background thread
+
+    Returns:
+        ThreadingHTTPServer: Running stub server (call .shutdown() to stop)
+    """
+    handler = type("ConfiguredWeatherStubHandler", (WeatherStubHandler,), {
+        "latency_ms": latency_ms,
+        "jitter_ms": jitter_ms,
+        "error_rate": error_rate
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ---------------------------------------------------------------------------
+# Backend process
+# ---------------------------------------------------------------------------
+
+def start_backend(server_cmd: str, host: str, port: int, weather_url: str,
+                  keep_limits: bool = False, timeout: float = 60.0):
+    """
+    Launch the backend under test and wait until the health check answers
+
+    Args:
+        server_cmd (str): Command template; {host} and {port} are substituted
+        host (str): Host to bind
+        port (int): Port to bind
+        weather_url (str): WEATHER_API_URL passed to the backend
+        keep_limits (bool): Keep the backend's admission control settings
+        timeout (float): Seconds to wait for the backend to come up
+
+    Returns:
+        subprocess.Popen: Backend process
+    """
+    env = dict(os.environ, MICROGRID_HOST=host, MICROGRID_PORT=str(port), WEATHER_API_URL=weather_url)
+    if not keep_limits:
+        env.update(UNLIMITED_ADMISSION_ENV)
+    cmd = shlex.split(server_cmd.format(host=host, port=port))
+    process = subprocess.Popen(
+        cmd,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+    deadline = time.time() + timeout
+    base_url = f"http://{host}:{port}"
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise Exception(f"Backend exited with code {process.returncode}: {server_cmd}")
+        try:
+            requests.get(f"{base_url}/", timeout=1)
+            return process
+        except requests.exceptions.RequestException:
+            time.sleep(0.2)
+
+    process.terminate()
+    raise Exception(f"Backend did not start within {timeout:.0f}s: {server_cmd}")
+
+
+# ---------------------------------------------------------------------------
+# Load generation
+# ---------------------------------------------------------------------------
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def classify_response(response) -> tuple:
+    """
+    Map an HTTP response to a load test outcome
+
+    Returns:
+        tuple: (outcome: str, retry_after: float seconds, 0 unless shed)
+    """
+    if response.status_code == 200:
+        return "ok", 0.0
+    if response.status_code in (429, 503):
+        try:
+            retry_after = float(response.headers.get("Retry-After", "1"))
+        except ValueError:
+            retry_after = 1.0
+        return "shed", retry_after
+    return "error", 0.0
+
+
+def build_request(base_url: str, endpoint: str, cities: list, stream_cities: int):
+    """
+    Return a function that issues one request and reports
+    (outcome, first_byte_s, retry_after_s)
+
+    ``outcome`` is 'ok', 'shed' (429/503 from admission control) or 'error'.
+    ``first_byte_s`` is the time to the first streamed record for the stream
+    endpoint and None for /predict. ``retry_after_s`` comes from the
+    Retry-After header of shed responses.
+    """
+    if endpoint == "stream":
+        def do_request(session):
+            batch = random.sample(cities, min(stream_cities, len(cities)))
+            if stream_cities > len(cities):
+                batch += random.choices(cities, k=stream_cities - len(cities))
+            started = time.perf_counter()
+            first_byte = None
+            with session.get(
+                f"{base_url}/predict/stream",
+                params={"city": batch},
+                stream=True,
+                timeout=120
+            ) as response:
+                if response.status_code != 200:
+                    outcome, retry_after = classify_response(response)
+                    return outcome, None, retry_after
+                outcome = "ok"
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    if first_byte is None:
+                        first_byte = time.perf_counter() - started
+                    if json.loads(line).get("status") == "error":
+                        outcome = "error"
+            return outcome, first_byte, 0.0
+        return do_request
+
+    def do_request(session):
+        response = session.get(
+            f"{base_url}/predict",
+            params={"city": random.choice(cities)},
+            timeout=30
+        )
+        outcome, retry_after = classify_response(response)
+        return outcome, None, retry_after
+    return do_request
+
+
+def run_level(do_request, concurrency: int, duration: float) -> dict:
+    """
+    Hammer the backend with ``concurrency`` closed-loop clients for ``duration`` seconds
+
+    Latency percentiles cover successful requests only, so instant 429/503
+    rejections do not flatter them. Shed clients wait for Retry-After before
+    trying again, like a well-behaved client would.
+
+    Returns:
+        dict: Throughput, latency percentiles and error statistics
+    """
+    latencies = []
+    first_bytes = []
+    status_counts = {"ok": 0, "shed": 0, "error": 0, "exception": 0}
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def worker():
+        session = requests.Session()
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            try:
+                outcome, first_byte, retry_after = do_request(session)
+            except requests.exceptions.RequestException:
+                outcome, first_byte, retry_after = "exception", None, 0.0
+            elapsed = time.perf_counter() - started
+            with lock:
+                status_counts[outcome] += 1
+                if outcome == "ok":
+                    latencies.append(elapsed)
+                if first_byte is not None:
+                    first_bytes.append(first_byte)
+
+            if outcome == "shed":
+                time.sleep(max(0.0, min(retry_after, stop_at - time.perf_counter())))
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    first_bytes.sort()
+    total = sum(status_counts.values())
+    failed = status_counts["error"] + status_counts["exception"]
+    ok = status_counts["ok"]
+
+    result = {
+        "concurrency": concurrency,
+        "requests": total,
+        "throughput_rps": round(ok / wall, 2) if wall > 0 else 0.0,
+        "error_rate": round(failed / total, 4) if total else 0.0,
+        "shed_rate": round(status_counts["shed"] / total, 4) if total else 0.0,
+        "errors": status_counts["error"],
+        "exceptions": status_counts["exception"],
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p90_ms": round(percentile(latencies, 90) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "max_ms": round((latencies[-1] if latencies else 0.0) * 1000, 1)
+    }
+    if first_bytes:
+        result["ttfb_p50_ms"] = round(percentile(first_bytes, 50) * 1000, 1)
+        result["ttfb_p99_ms"] = round(percentile(first_bytes, 99) * 1000, 1)
+    return result
+
+
+def find_saturation(results: list, min_gain: float) -> dict:
+    """
+    Locate the saturation point of a concurrency sweep
+
+    The saturation point is the last concurrency level whose throughput
+    improved on the previous level by at least ``min_gain`` (fraction),
+    provided a later level then failed to. Beyond it, extra clients only
+    add queueing latency. If throughput was still growing at the highest
+    level, saturation was not reached within the sweep.
+
+    Returns:
+        dict or None: The result row at the saturation point, or None if
+            it was not reached within the sweep
+    """
+    best = results[0] if results else None
+    for previous, current in zip(results, results[1:]):
+        if previous["throughput_rps"] <= 0:
+            best = current
+            continue
+        gain = (current["throughput_rps"] - previous["throughput_rps"]) / previous["throughput_rps"]
+        if gain < min_gain:
+            return best
+        best = current
+    return None
+
+
+def print_report(results: list, saturation: dict, label: str):
+    """Print a sweep summary table"""
+    print(f"\n{'='*60}")
+    print(f"LOAD TEST RESULTS: {label}")
+    print(f"{'='*60}")
+    header = f"{'conc':>5} {'reqs':>7} {'ok rps':>9} {'err%':>6} {'shed%':>6} {'p50ms':>8} {'p90ms':>8} {'p99ms':>8} {'maxms':>8}"
+    has_ttfb = any("ttfb_p50_ms" in row for row in results)
+    if has_ttfb:
+        header += f" {'ttfb50':>8} {'ttfb99':>8}"
+    print(header)
+    for row in results:
+        line = (
+            f"{row['concurrency']:>5} {row['requests']:>7} {row['throughput_rps']:>9.2f} "
+            f"{row['error_rate'] * 100:>6.2f} {row['shed_rate'] * 100:>6.2f} {row['p50_ms']:>8.1f} {row['p90_ms']:>8.1f} "
+            f"{row['p99_ms']:>8.1f} {row['max_ms']:>8.1f}"
+        )
+        if has_ttfb:
+            line += f" {row.get('ttfb_p50_ms', 0.0):>8.1f} {row.get('ttfb_p99_ms', 0.0):>8.1f}"
+        print(line)
+    if saturation:
+        print(f"\nSaturation point: concurrency={saturation['concurrency']} "
+              f"({saturation['throughput_rps']:.2f} req/s, p99 {saturation['p99_ms']:.1f} ms)")
+    else:
+        print("\nSaturation point: not reached within sweep (add higher --concurrency levels)")
+    print(f"{'='*60}\n")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline load test for the microgrid backend")
+    parser.add_argument("--endpoint", choices=["predict", "stream"], default="predict",
+                        help="Endpoint to drive (default: predict)")
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32",
+                        help="Comma-separated concurrency levels to sweep")
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="Seconds to run each concurrency level")
+    parser.add_argument("--cities", default=",".join(DEFAULT_CITIES),
+                        help="Comma-separated city names to request")
+    parser.add_argument("--stream-cities", type=int, default=20,
+                        help="Cities per /predict/stream request")
+
+    parser.add_argument("--stub-host", default="127.0.0.1")
+    parser.add_argument("--stub-port", type=int, default=5901)
+    parser.add_argument("--stub-latency-ms", type=float, default=150.0,
+                        help="Mean WeatherAPI stub latency")
+    parser.add_argument("--stub-jitter-ms", type=float, default=50.0,
+                        help="Uniform +/- jitter on stub latency")
+    parser.add_argument("--stub-error-rate", type=float, default=0.0,
+                        help="Fraction of stub responses that return HTTP 500")
+    parser.add_argument("--no-stub", action="store_true",
+                        help="Do not start the WeatherAPI stub")
+    parser.add_argument("--stub-only", action="store_true",
+                        help="Only run the WeatherAPI stub until interrupted (for use with --target)")
+
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5900)
+    parser.add_argument("--server-cmd", default=f"{shlex.quote(sys.executable)} app.py",
+                        help="Backend command; {host} and {port} are substituted")
+    parser.add_argument("--target", default=None,
+                        help="Use an already running backend instead of starting one")
+
+    parser.add_argument("--keep-limits", action="store_true",
+                        help="Keep the backend's rate limit and in-flight limits "
+                             "(by default they are disabled for the launched backend)")
+    parser.add_argument("--min-gain", type=float, default=0.10,
+                        help="Throughput gain below which the sweep is considered saturated")
+    parser.add_argument("--json", dest="json_path", default=None,
+                        help="Write results to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    cities = [city.strip() for city in args.cities.split(",") if city.strip()]
+
+    stub = None
+    backend = None
+    weather_url = f"http://{args.stub_host}:{args.stub_port}/v1/current.json"
+
+    try:
+        if not args.no_stub:
+            stub = make_weather_stub(
+                args.stub_host, args.stub_port,
+                args.stub_latency_ms, args.stub_jitter_ms, args.stub_error_rate
+            )
+            print(f"[OK] WeatherAPI stub on {weather_url} "
+                  f"(latency {args.stub_latency_ms:.0f}±{args.stub_jitter_ms:.0f} ms, "
+                  f"error rate {args.stub_error_rate:.1%})")
+
+        if args.stub_only:
+            print("Start the backend with WEATHER_API_URL set to the stub URL. Ctrl-C to stop.")
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                return
+
+        if args.target:
+            base_url = args.target.rstrip("/")
+        else:
+            backend = start_backend(
+                args.server_cmd, args.host, args.port, weather_url,
+                keep_limits=args.keep_limits
+            )
+            base_url = f"http://{args.host}:{args.port}"
+            limits = "admission limits kept" if args.keep_limits else "admission limits disabled"
+            print(f"[OK] Backend started: {args.server_cmd} ({limits})")
+
+        do_request = build_request(base_url, args.endpoint, cities, args.stream_cities)
+        results = []
+        for concurrency in levels:
+            print(f"Running concurrency={concurrency} for {args.duration:.0f}s...")
+            row = run_level(do_request, concurrency, args.duration)
+            print(f"  {row['throughput_rps']:.2f} req/s, p99 {row['p99_ms']:.1f} ms, "
+                  f"errors {row['error_rate']:.1%}, shed {row['shed_rate']:.1%}")
+            results.append(row)
+
+        saturation = find_saturation(results, args.min_gain)
+        label = f"/{'predict/stream' if args.endpoint == 'stream' else 'predict'} via {args.target or args.server_cmd}"
+        print_report(results, saturation, label)
+
+        if args.json_path:
+            with open(args.json_path, "w") as f:
+                json.dump({
+                    "label": label,
+                    "stub": None if args.no_stub else {
+                        "latency_ms": args.stub_latency_ms,
+                        "jitter_ms": args.stub_jitter_ms,
+                        "error_rate": args.stub_error_rate
+                    },
+                    "results": results,
+                    "saturation": saturation
+                }, f, indent=2)
+            print(f"[OK] Results written to {args.json_path}")
+
+    finally:
+        if backend is not None:
+            backend.terminate()
+            try:
+                backend.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                backend.kill()
+        if stub is not None:
+            stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""
+Admission Service
+Bounded in-flight admission control and per-client token-bucket rate limiting
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request
+from config import (
+    MAX_IN_FLIGHT,
+    MAX_STREAMS_IN_FLIGHT,
+    STREAM_MAX_CITIES,
+    RATE_LIMIT_RPS,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_KEY_HEADER,
+    RATE_LIMIT_API_KEYS,
+    TRUST_FORWARDED_FOR
+)
+from services.stream_service import parse_stream_cities
+from utils.validators import create_error_response
+
+
+class TokenBucketLimiter:
+    """
+    Per-client token buckets
+
+    Each active client costs one dict entry (tokens, last refill time).
+    Entries are kept in least-recently-used order and evicted once their
+    bucket would have refilled completely, so memory stays proportional to
+    the number of recently active clients.
+
+    A request may cost more than one token. Costs above the burst size are
+    admitted once the bucket is full and leave it in debt, so the client
+    waits until the sustained rate has paid for the whole request.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Args:
+            rate (float): Tokens added per second (sustained requests/s, <= 0 disables)
+            burst (int): Bucket capacity (max requests in a burst)
+        """
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+
+    def acquire(self, key: str, cost: int = 1) -> tuple:
+        """
+        Take ``cost`` tokens from the client's bucket
+
+        Args:
+            key (str): Client identifier
+            cost (int): Tokens the request consumes (e.g. cities in a stream)
+
+        Returns:
+            tuple: (allowed: bool, retry_after: float seconds)
+        """
+        if self.rate <= 0:
+            # Rate limiting disabled
+            with self.lock:
+                self.allowed += 1
+            return True, 0.0
+
+        now = time.monotonic()
+        with self.lock:
+            self._evict_idle(now)
+
+            tokens, last = self.buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+
+            # Tokens may be negative (debt) after an oversized request
+            required = min(float(cost), self.burst)
+            if tokens >= required:
+                self.buckets[key] = (tokens - cost, now)
+                self.allowed += 1
+                return True, 0.0
+
+            self.buckets[key] = (tokens, now)
+            self.limited += 1
+            return False, (required - tokens) / self.rate
+
+    def _evict_idle(self, now: float):
+        """Drop buckets that have been idle long enough to be full again"""
+        while self.buckets:
+            key, (tokens, last) = next(iter(self.buckets.items()))
+            if tokens + (now - last) * self.rate < self.burst:
+                break
+            self.buckets.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Current limiter state"""
+        with self.lock:
+            self._evict_idle(time.monotonic())
+            return {
+                "rate_per_second": self.rate,
+                "burst": int(self.burst),
+                "active_clients": len(self.buckets),
+                "allowed": self.allowed,
+                "rate_limited": self.limited
+            }
+
+
+class AdmissionController:
+    """
+    Bounded in-flight request limit with fast shedding
+
+    Requests beyond ``max_in_flight`` are rejected immediately instead of
+    queueing behind slow WeatherAPI calls. Retry-after is estimated from an
+    exponentially weighted moving average of request service time.
+    """
+
+    def __init__(self, max_in_flight: int, ewma_alpha: float = 0.2):
+        """
+        Args:
+            max_in_flight (int): Maximum concurrently admitted requests
+            ewma_alpha (float): Smoothing factor for the service time average
+        """
+        self.max_in_flight = max_in_flight
+        self.ewma_alpha = ewma_alpha
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.ewma_latency = 0.0
+        self.lock = threading.Lock()
+        self.admitted = 0
+        self.shed = 0
+
+    def try_acquire(self) -> tuple:
+        """
+        Try to admit a request
+
+        Returns:
+            tuple: (admitted: bool, retry_after: float seconds)
+        """
+        with self.lock:
+            if self.in_flight >= self.max_in_flight:
+                self.shed += 1
+                return False, self.ewma_latency
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.admitted += 1
+            return True, 0.0
+
+    def release(self, elapsed: float):
+        """
+        Release an admitted request
+
+        Args:
+            elapsed (float): Request service time in seconds
+        """
+        with self.lock:
+            self.in_flight -= 1
+            if self.ewma_latency == 0.0:
+                self.ewma_latency = elapsed
+            else:
+                self.ewma_latency += self.ewma_alpha * (elapsed - self.ewma_latency)
+
+    def stats(self) -> dict:
+        """Current admission state"""
+        with self.lock:
+            return {
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "admitted": self.admitted,
+                "shed": self.shed,
+                "ewma_latency_ms": round(self.ewma_latency * 1000, 2)
+            }
+
+
+# Global admission state (shared by all request threads in this process)
+# Streams get their own controller: each one fans out to STREAM_MAX_WORKERS
+# upstream calls and lasts far longer than a /predict request, so sharing
+# slots or the latency average would make neither limit meaningful.
+# Upstream concurrency is bounded by
+# MAX_IN_FLIGHT + MAX_STREAMS_IN_FLIGHT * STREAM_MAX_WORKERS.
+rate_limiter = TokenBucketLimiter(RATE_LIMIT_RPS, RATE_LIMIT_BURST)
+admission_controller = AdmissionController(MAX_IN_FLIGHT)
+stream_admission_controller = AdmissionController(MAX_STREAMS_IN_FLIGHT)
+
+
+def get_client_key() -> str:
+    """
+    Identify the calling client
+
+    Uses the API key header only when the key is in RATE_LIMIT_API_KEYS;
+    the header is not authenticated otherwise, and honouring arbitrary keys
+    would let a client rotate keys to get a fresh bucket per request.
+    Everyone else is keyed by client IP. With TRUST_FORWARDED_FOR enabled
+    this is the right-most X-Forwarded-For entry, the one appended by the
+    trusted proxy; entries to its left are supplied by the client and
+    could be rotated freely.
+
+    Returns:
+        str: Client identifier
+    """
+    api_key = request.headers.get(RATE_LIMIT_KEY_HEADER)
+    if api_key and api_key in RATE_LIMIT_API_KEYS:
+        return f"key:{api_key}"
+
+    if TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("X-Forwarded-For", "")
+        if forwarded:
+            return f"ip:{forwarded.split(',')[-1].strip()}"
+
+    return f"ip:{request.remote_addr}"
+
+
+def _retry_response(error_type: str, message: str, status_code: int, retry_after: float):
+    """Build an error response carrying a Retry-After header"""
+    seconds = max(1, math.ceil(retry_after))
+    response, status = create_error_response(
+        error_type,
+        f"{message} Retry after {seconds}s.",
+        status_code
+    )
+    response.headers["Retry-After"] = str(seconds)
+    return response, status
+
+
+def _stream_request_cost() -> int:
+    """Rate limit cost of a /predict/stream request: one token per city"""
+    cities = len(parse_stream_cities(request.args))
+    return min(max(1, cities), STREAM_MAX_CITIES)
+
+
+def _admission_decorator(controller: AdmissionController, cost=None):
+    """
+    Build a decorator applying rate limiting and ``controller`` to a Flask view
+
+    Args:
+        controller (AdmissionController): In-flight limit for the view
+        cost (callable): Returns the request's token cost (default 1)
+
+    Rejections:
+        429: Client exceeded its token bucket
+        503: Server at the controller's in-flight limit
+
+    Streamed responses keep their in-flight slot until the stream closes.
+    """
+    def decorator(view):
+        return _admission_wrapper(view, controller, cost)
+    return decorator
+
+
+def _admission_wrapper(view, controller: AdmissionController, cost=None):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        tokens = cost() if cost is not None else 1
+        allowed, retry_after = rate_limiter.acquire(get_client_key(), tokens)
+        if not allowed:
+            return _retry_response(
+                "Too Many Requests",
+                "Rate limit exceeded.",
+                429,
+                retry_after
+            )
+
+        admitted, retry_after = controller.try_acquire()
+        if not admitted:
+            return _retry_response(
+                "Service Overloaded",
+                "Server is at capacity.",
+                503,
+                retry_after
+            )
+
+        started = time.perf_counter()
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                controller.release(time.perf_counter() - started)
+
+        try:
+            result = view(*args, **kwargs)
+        except Exception:
+            release()
+            raise
+
+        response = result[0] if isinstance(result, tuple) else result
+        if getattr(response, "is_streamed", False):
+            response.call_on_close(release)
+        else:
+            release()
+        return result
+
+    return wrapper
+
+
+# Decorators for /predict and /predict/stream respectively
+# A stream costs one token per city, so splitting a fleet across streams
+# or batching it into one gives the same sustained city rate
+admission_controlled = _admission_decorator(admission_controller)
+stream_admission_controlled = _admission_decorator(
+    stream_admission_controller,
+    cost=_stream_request_cost
+)
+
+
+def get_admission_metrics() -> dict:
+    """
+    Public interface to admission and rate limiter state
+
+    Returns:
+        dict: {"admission": dict, "stream_admission": dict, "rate_limiter": dict}
+    """
+    return {
+        "admission": admission_controller.stats(),
+        "stream_admission": stream_admission_controller.stats(),
+        "rate_limiter": rate_limiter.stats()
+    }
@@ -0,0 +1,269 @@
+"""
+Location Service
+Resolves free-text city names to canonical locations using an offline gazetteer
+"""
+
+import bisect
+import csv
+import difflib
+import re
+import threading
+import unicodedata
+from config import GAZETTEER_PATH, CITY_SUGGEST_CUTOFF, CITY_RESOLUTION_STRICT
+
+
+# Qualifiers that never narrow down a location ("Pune, India")
+_COUNTRY_QUALIFIERS = {"india", "in", "ind", "bharat"}
+
+
+def normalize_name(text: str) -> str:
+    """
+    Normalize a place name for lookup
+
+    Lowercases, strips accents and punctuation, and collapses whitespace,
+    so "Pune", "pune " and "PUNE." all map to "pune".
+    """
+    text = text.replace("&", " and ")
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^a-z0-9 ]+", " ", text.lower())
+    return " ".join(text.split())
+
+
+class CityIndex:
+    """
+    In-memory gazetteer index
+
+    Locations are stored once as tuples; a dict maps every normalized name
+    and alias to location indexes for exact lookups. Only exact matches
+    resolve: prefix (bisect over a sorted key list) and fuzzy (difflib)
+    matches are offered as suggestions, since a near-miss such as "Durg"
+    is often a different real place ("Durgapur").
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Gazetteer CSV (id, name, state, lat, lon, aliases)
+        """
+        # (id, name, state, state_code, lat, lon)
+        self.locations = []
+        self.by_name = {}
+        self.by_id = {}
+        self.load(path)
+        self.keys = sorted(self.by_name)
+
+    def load(self, path: str):
+        """
+        Load gazetteer rows into the index
+
+        Raises:
+            Exception: If the gazetteer file is missing or malformed
+        """
+        try:
+            with open(path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    location_id = row["id"].strip()
+                    state_code = location_id.split("-")[1] if location_id.count("-") >= 2 else ""
+                    index = len(self.locations)
+                    self.locations.append((
+                        location_id,
+                        row["name"].strip(),
+                        row["state"].strip(),
+                        state_code,
+                        float(row["lat"]),
+                        float(row["lon"])
+                    ))
+                    self.by_id[location_id] = index
+
+                    names = [row["name"]] + (row.get("aliases") or "").split("|")
+                    for name in names:
+                        key = normalize_name(name)
+                        if key:
+                            self.by_name.setdefault(key, []).append(index)
+
+        except FileNotFoundError:
+            raise Exception(f"Gazetteer file not found: {path}")
+
+        except (KeyError, ValueError) as e:
+            raise Exception(f"Invalid gazetteer file {path}: {str(e)}")
+
+    def _filter_by_qualifiers(self, indexes: list, qualifiers: list) -> list:
+        """
+        Keep locations whose state matches any qualifier ("Aurangabad, Bihar")
+
+        A qualifier naming no candidate's state filters everything out:
+        "Salem, Oregon" is not Salem in Tamil Nadu.
+        """
+        if not qualifiers:
+            return indexes
+        return [
+            i for i in indexes
+            if normalize_name(self.locations[i][2]) in qualifiers
+            or self.locations[i][3].lower() in qualifiers
+        ]
+
+    def _prefix_matches(self, prefix: str) -> set:
+        """Location indexes whose name or alias starts with prefix"""
+        matches = set()
+        start = bisect.bisect_left(self.keys, prefix)
+        for key in self.keys[start:]:
+            if not key.startswith(prefix):
+                break
+            matches.update(self.by_name[key])
+        return matches
+
+    def suggest(self, text: str, limit: int = 3) -> list:
+        """
+        Known location names close to an unresolved input
+
+        Prefix matches ("Thiruvanantha") come first, then fuzzy matches
+        ("Banglore"). Suggestions are never used to resolve a request.
+        """
+        name = normalize_name(text.split(",")[0])
+        if not name:
+            return []
+
+        indexes = sorted(self._prefix_matches(name)) if len(name) >= 3 else []
+        # Fuzzy candidates share the first letter: keeps difflib fast on
+        # village-level gazetteers with hundreds of thousands of names
+        candidates = self.keys[bisect.bisect_left(self.keys, name[0]):
+                               bisect.bisect_left(self.keys, chr(ord(name[0]) + 1))]
+        for key in difflib.get_close_matches(name, candidates, n=limit * 2, cutoff=CITY_SUGGEST_CUTOFF):
+            indexes.extend(self.by_name[key])
+
+        suggestions = []
+        for index in indexes:
+            display = self.locations[index][1]
+            if display not in suggestions:
+                suggestions.append(display)
+        return suggestions[:limit]
+
+    def _exact_matches(self, text: str) -> list:
+        """Location indexes whose name or alias equals text, after state qualifiers"""
+        parts = [normalize_name(part) for part in text.split(",")]
+        name = parts[0] if parts else ""
+        qualifiers = [p for p in parts[1:] if p and p not in _COUNTRY_QUALIFIERS]
+        if not name:
+            return []
+        return self._filter_by_qualifiers(self.by_name.get(name, []), qualifiers)
+
+    def ambiguous_matches(self, text: str) -> list:
+        """
+        State-qualified names of every location text could mean
+
+        Places sharing both name and state (common for villages) are listed
+        by location ID, which resolve() also accepts.
+
+        Returns:
+            list: e.g. ["Aurangabad, Maharashtra", "Aurangabad, Bihar"], or an
+                empty list when text matches at most one location
+        """
+        indexes = self._exact_matches(text)
+        if len(indexes) < 2:
+            return []
+        names = [f"{self.locations[i][1]}, {self.locations[i][2]}" for i in indexes]
+        return [
+            name if names.count(name) == 1 else self.locations[i][0]
+            for i, name in zip(indexes, names)
+        ]
+
+    def resolve(self, text: str):
+        """
+        Resolve free text to a location by exact name or alias
+
+        A name shared by several locations ("Aurangabad") only resolves
+        once a state qualifier picks one of them; a location ID
+        ("IN-BR-AURANGABAD") always resolves.
+
+        Args:
+            text (str): User supplied city, optionally with ", state" / ", India"
+
+        Returns:
+            dict or None: {"id", "name", "state", "lat", "lon", "match"} or None
+        """
+        index = self.by_id.get(text.strip().upper())
+        if index is not None:
+            return self._result(index, "id")
+
+        indexes = self._exact_matches(text)
+        if len(indexes) != 1:
+            return None
+        return self._result(indexes[0], "exact")
+
+    def _result(self, index: int, match: str) -> dict:
+        location_id, name, state, state_code, lat, lon = self.locations[index]
+        return {
+            "id": location_id,
+            "name": name,
+            "state": state,
+            "lat": lat,
+            "lon": lon,
+            "match": match
+        }
+
+
+# Global city index (loaded on first use)
+city_index = None
+_city_index_lock = threading.Lock()
+
+
+def get_city_index() -> CityIndex:
+    """Return the global city index, loading the gazetteer once on first use"""
+    global city_index
+    if city_index is None:
+        # Stream pool threads may all arrive here on the first request
+        with _city_index_lock:
+            if city_index is None:
+                city_index = CityIndex(GAZETTEER_PATH)
+    return city_index
+
+
+def resolve_city(city: str) -> tuple:
+    """
+    Public interface to resolve a city before any upstream call
+
+    Args:
+        city (str): City name from request
+
+    Returns:
+        tuple: (location: dict or None, error_response: dict or None)
+            location["query"] is the value to send to WeatherAPI.
+            With CITY_RESOLUTION_STRICT disabled, unknown and ambiguous
+            names pass through unchanged as an unresolved location.
+    """
+    index = get_city_index()
+    location = index.resolve(city)
+
+    if location is not None:
+        location["query"] = f"{location['lat']},{location['lon']}"
+        return location, None
+
+    if not CITY_RESOLUTION_STRICT:
+        return {
+            "id": None,
+            "name": city,
+            "state": None,
+            "lat": None,
+            "lon": None,
+            "match": "unresolved",
+            "query": city
+        }, None
+
+    suggestions = index.ambiguous_matches(city)
+    if suggestions:
+        return None, {
+            "error": "Ambiguous city",
+            "message": f"City '{city}' matches several locations. Use one of: {'; '.join(suggestions)}.",
+            "suggestions": suggestions
+        }
+
+    suggestions = index.suggest(city)
+    message = f"City '{city}' is not in the gazetteer."
+    if suggestions:
+        message += f" Did you mean: {', '.join(suggestions)}?"
+    return None, {
+        "error": "Unknown city",
+        "message": message,
+        "suggestions": suggestions
+    }
@@ -3,9 +3,11 @@ Prediction Service
 Loads ML models and generates predictions for load, solar, and wind
 """
 
+import threading
 import joblib
 import pandas as pd
 from config import GRID_LOAD_MODEL_PATH, SOLAR_MODEL_PATH, WIND_MODEL_PATH
+from services.profiling_service import trace_stage
 
 
 class PredictionService:
@@ -101,8 +103,10 @@ class PredictionService:
             float: Predicted load in kW (capped at realistic maximum)
         """
         try:
-            features = self.prepare_features(weather_data, "load")
-            prediction = self.grid_load_model.predict(features)
+            with trace_stage("prepare_features.load"):
+                features = self.prepare_features(weather_data, "load")
+            with trace_stage("predict_load"):
+                prediction = self.grid_load_model.predict(features)
             raw_value = float(prediction[0])
         
             # Return raw model prediction (removing village scaling)
@@ -123,8 +127,10 @@ class PredictionService:
             float: Predicted solar generation in kW (capped at realistic maximum)
         """
         try:
-            features = self.prepare_features(weather_data, "solar")
-            prediction = self.solar_model.predict(features)
+            with trace_stage("prepare_features.solar"):
+                features = self.prepare_features(weather_data, "solar")
+            with trace_stage("predict_solar"):
+                prediction = self.solar_model.predict(features)
             raw_value = float(prediction[0])
         
             # Return raw model prediction (removing time-of-day scaling)
@@ -146,8 +152,10 @@ class PredictionService:
         """
         try:
             # Using ML Model with Hackathon Scaling (for visual impact in demo)
-            features = self.prepare_features(weather_data, "wind")
-            prediction = self.wind_model.predict(features)
+            with trace_stage("prepare_features.wind"):
+                features = self.prepare_features(weather_data, "wind")
+            with trace_stage("predict_wind"):
+                prediction = self.wind_model.predict(features)
             raw_value = float(prediction[0])
             
             # Apply scaling factor (0.4x) to make the data impactful for demo
@@ -192,6 +200,10 @@ class PredictionService:
 # Global prediction service instance
 prediction_service = None
 
+# Guards lazy initialization; a load failure is cached so it is reported once
+_init_lock = threading.Lock()
+_init_error = None
+
 
 def initialize_prediction_service():
     """Initialize the global prediction service"""
@@ -209,7 +221,19 @@ def get_predictions(weather_data: dict) -> dict:
     Returns:
         dict: All predictions
     """
+    global _init_error
+    
+    # WSGI servers (e.g. gunicorn) import app.py without running __main__,
+    # so load models lazily on first use
     if prediction_service is None:
-        raise Exception("Prediction service not initialized")
+        with _init_lock:
+            if prediction_service is None:
+                if _init_error is not None:
+                    raise Exception(_init_error)
+                try:
+                    initialize_prediction_service()
+                except Exception as e:
+                    _init_error = str(e)
+                    raise
     
     return prediction_service.predict_all(weather_data)
@@ -0,0 +1,258 @@
+"""
+Profiling Service
+On-demand sampling profiles of live requests and per-request stage tracing
+"""
+
+import cProfile
+import contextvars
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from flask import request, jsonify
+from config import PROFILE_DIR, ADMIN_TOKEN_HEADER
+from utils.validators import validate_admin_token, create_error_response
+
+
+# Threads currently serving a request (sampled by default)
+_request_threads = set()
+_request_threads_lock = threading.Lock()
+
+# Only one sampling capture at a time
+_sampler_lock = threading.Lock()
+
+# cProfile can only have one active profiler per process on newer Pythons
+_cprofile_lock = threading.Lock()
+
+# Stage timings of the traced request in the current context (None = not tracing)
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+
+# ---------------------------------------------------------------------------
+# Request thread registry
+# ---------------------------------------------------------------------------
+
+def register_request_thread():
+    """Mark the calling thread as serving a request"""
+    with _request_threads_lock:
+        _request_threads.add(threading.get_ident())
+
+
+def unregister_request_thread():
+    """Unmark the calling thread once its request is finished"""
+    with _request_threads_lock:
+        _request_threads.discard(threading.get_ident())
+
+
+@contextmanager
+def request_thread():
+    """Context manager form of register/unregister (for worker pools)"""
+    register_request_thread()
+    try:
+        yield
+    finally:
+        unregister_request_thread()
+
+
+# ---------------------------------------------------------------------------
+# Sampling profiler
+# ---------------------------------------------------------------------------
+
+def _frame_name(frame) -> str:
+    """Format a frame as 'module.py:function' for collapsed stacks"""
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{os.path.basename(code.co_filename)}:{name}"
+
+
+def capture_stack_samples(seconds: float, interval: float, all_threads: bool = False) -> dict:
+    """
+    Sample the Python stacks of live request threads
+
+    Args:
+        seconds (float): Capture duration
+        interval (float): Seconds between samples
+        all_threads (bool): Sample every thread, not only request threads
+
+    Returns:
+        dict: {"stacks": Counter of collapsed stack -> samples,
+               "samples": int, "duration_s": float}
+
+    Raises:
+        Exception: If another capture is already running
+    """
+    if not _sampler_lock.acquire(blocking=False):
+        raise Exception("A profile capture is already running")
+
+    try:
+        own_thread = threading.get_ident()
+        stacks = Counter()
+        samples = 0
+        started = time.perf_counter()
+        deadline = started + seconds
+
+        while time.perf_counter() < deadline:
+            if all_threads:
+                targets = None
+            else:
+                with _request_threads_lock:
+                    targets = set(_request_threads)
+
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                if targets is not None and thread_id not in targets:
+                    continue
+
+                names = []
+                while frame is not None:
+                    names.append(_frame_name(frame))
+                    frame = frame.f_back
+                stacks[";".join(reversed(names))] += 1
+
+            samples += 1
+            time.sleep(interval)
+
+        return {
+            "stacks": stacks,
+            "samples": samples,
+            "duration_s": round(time.perf_counter() - started, 3)
+        }
+
+    finally:
+        _sampler_lock.release()
+
+
+def format_collapsed(stacks: Counter) -> str:
+    """
+    Render samples in collapsed-stack format ('frame;frame;frame count')
+
+    Compatible with flamegraph.pl, speedscope and inferno.
+    """
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+# ---------------------------------------------------------------------------
+# Per-request tracing
+# ---------------------------------------------------------------------------
+
+@contextmanager
+def trace_stage(name: str):
+    """
+    Record the wall time of a pipeline stage when the current request is traced
+
+    No-op (a single context variable lookup) for untraced requests.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        trace[name] = round(trace.get(name, 0.0) + elapsed_ms, 3)
+
+
+@contextmanager
+def traced_request(label: str, with_cprofile: bool = True):
+    """
+    Trace the enclosed request: collect stage timings and optionally a cProfile
+
+    Args:
+        label (str): Label used in the pstats file name (e.g. city)
+        with_cprofile (bool): Also run cProfile and dump a .pstats file
+
+    Yields:
+        dict: Trace summary, filled in when the block exits
+            {"stages_ms": dict, "total_ms": float,
+             "pstats_file": str or None, "profiler": str}
+    """
+    stages = {}
+    summary = {"stages_ms": stages, "total_ms": 0.0, "pstats_file": None, "profiler": "off"}
+    token = _current_trace.set(stages)
+
+    profiler = None
+    if with_cprofile:
+        if _cprofile_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+        else:
+            summary["profiler"] = "busy"
+
+    started = time.perf_counter()
+    try:
+        if profiler is not None:
+            profiler.enable()
+        yield summary
+
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            try:
+                summary["pstats_file"] = _dump_pstats(profiler, label)
+                summary["profiler"] = "cprofile"
+            finally:
+                _cprofile_lock.release()
+
+        summary["total_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        _current_trace.reset(token)
+
+
+def _dump_pstats(profiler: cProfile.Profile, label: str) -> str:
+    """Write profiler stats to PROFILE_DIR and return the file path"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    safe_label = "".join(c if c.isalnum() else "_" for c in label)[:40] or "request"
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    path = os.path.join(PROFILE_DIR, f"predict-{timestamp}-{safe_label}.pstats")
+    profiler.dump_stats(path)
+    return path
+
+
+def traceable(view):
+    """
+    Decorator enabling per-request opt-in tracing of a JSON Flask view
+
+    Tracing is requested with ``?trace=stages`` (stage timings only) or
+    ``?trace=pstats`` (stage timings plus a cProfile .pstats file) and
+    requires the admin token. The trace summary is added to the JSON
+    response under ``"trace"``.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        mode = request.args.get("trace", "").strip().lower()
+        if not mode:
+            return view(*args, **kwargs)
+
+        if mode not in ("stages", "pstats"):
+            return create_error_response(
+                "Invalid parameter value",
+                "trace must be 'stages' or 'pstats'",
+                400
+            )
+
+        is_valid, error_response = validate_admin_token(request.headers.get(ADMIN_TOKEN_HEADER))
+        if not is_valid:
+            return create_error_response(
+                error_response["error"],
+                error_response["message"],
+                403
+            )
+
+        label = request.args.get("city", "request")
+        with traced_request(label, with_cprofile=(mode == "pstats")) as summary:
+            result = view(*args, **kwargs)
+
+        response, status = result if isinstance(result, tuple) else (result, 200)
+        payload = response.get_json(silent=True)
+        if not isinstance(payload, dict):
+            return result
+        payload["trace"] = summary
+        return jsonify(payload), status
+
+    return wrapper
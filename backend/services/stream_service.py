@@ -0,0 +1,224 @@
+"""
+Stream Service
+Runs the weather -> prediction -> dispatch pipeline for many cities and
+yields each result as soon as it is ready (NDJSON or Server-Sent Events)
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from config import STREAM_MAX_WORKERS
+from services.weather_service import get_weather_features
+from services.prediction_service import get_predictions
+from services.dispatch_service import get_dispatch_decision
+from services.profiling_service import request_thread
+from services.location_service import resolve_city
+from utils.validators import validate_city_parameter
+
+
+def build_prediction_response(weather_data: dict, predictions: dict, dispatch_result: dict) -> dict:
+    """
+    Build the JSON-ready prediction payload returned to the frontend
+
+    Args:
+        weather_data (dict): Weather features from weather service
+        predictions (dict): Output of the prediction service
+        dispatch_result (dict): Output of the dispatch engine
+
+    Returns:
+        dict: Prediction payload (same shape as /predict)
+    """
+    return {
+        "predicted_load": round(predictions["predicted_load"], 2),
+        "predicted_solar": round(predictions["predicted_solar"], 2),
+        "predicted_wind": round(predictions["predicted_wind"], 2),
+        "solar_used": dispatch_result["solar_used"],
+        "wind_used": dispatch_result["wind_used"],
+        "grid_import": dispatch_result["grid_import"],
+        "grid_export": dispatch_result["grid_export"],
+
+        # Weather Data
+        "weather": {
+            "temperature": weather_data.get("temperature"),
+            "wind_speed": weather_data.get("wind_speed"),
+            "humidity": weather_data.get("humidity"),
+            "pressure": weather_data.get("atmospheric_pressure"),
+            "solar_radiance": weather_data.get("solar_irradiance"),
+            "cloud_cover": weather_data.get("cloud", 0),
+            "city": weather_data.get("city"),
+            "location_id": weather_data.get("location_id"),
+        }
+    }
+
+
+def parse_stream_cities(args) -> list:
+    """
+    Collect the requested cities from /predict/stream query parameters
+
+    ``cities`` is split on every comma, so state-qualified names
+    ("Aurangabad, Bihar") must be sent as repeated ``city`` parameters.
+
+    Args:
+        args: Request query arguments (``cities`` comma-separated and/or
+            repeated ``city``)
+
+    Returns:
+        list: Stripped, non-empty city names in request order
+    """
+    cities = []
+    for value in args.getlist("cities"):
+        cities.extend(value.split(","))
+    cities.extend(args.getlist("city"))
+    return [city.strip() for city in cities if city.strip()]
+
+
+def run_city_pipeline(city: str) -> dict:
+    """
+    Run the full pipeline for a single city
+
+    Args:
+        city (str): Name of the city
+
+    Returns:
+        dict: Stream record, either
+            {"city": str, "status": "ok", "result": dict}
+            or {"city": str, "status": "error", "error": str, "message": str}
+    """
+    is_valid, error_response = validate_city_parameter(city)
+    if not is_valid:
+        return {"city": city, "status": "error", **error_response}
+
+    try:
+        location, error_response = resolve_city(city)
+        if location is None:
+            return {"city": city, "status": "error", **error_response}
+
+        # Register pool threads so sampling profiles include stream work
+        with request_thread():
+            weather_data = get_weather_features(
+                location["name"],
+                query=location["query"],
+                location_id=location["id"]
+            )
+            predictions = get_predictions(weather_data)
+            dispatch_result = get_dispatch_decision(
+                predicted_load=predictions["predicted_load"],
+                predicted_solar=predictions["predicted_solar"],
+                predicted_wind=predictions["predicted_wind"]
+            )
+        return {
+            "city": city,
+            "status": "ok",
+            "result": build_prediction_response(weather_data, predictions, dispatch_result)
+        }
+    except Exception as e:
+        return {
+            "city": city,
+            "status": "error",
+            "error": "Prediction Error",
+            "message": str(e)
+        }
+
+
+def iter_fleet_predictions(cities: list, max_workers: int = STREAM_MAX_WORKERS):
+    """
+    Yield per-city stream records in completion order
+
+    At most ``max_workers`` cities are in flight at any time. New cities are
+    only submitted after a finished record has been handed to the consumer,
+    so a slow client throttles upstream WeatherAPI calls instead of letting
+    results pile up in memory (backpressure).
+
+    Args:
+        cities (list): City names to process
+        max_workers (int): Maximum number of concurrent city pipelines
+
+    Yields:
+        dict: One record per city, followed by a final summary record
+            {"status": "done", "total": int, "succeeded": int,
+             "failed": int, "elapsed_ms": float}
+    """
+    started = time.perf_counter()
+    succeeded = 0
+    failed = 0
+
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    pending = set()
+    remaining = iter(cities)
+
+    def submit_next():
+        for city in remaining:
+            pending.add(executor.submit(run_city_pipeline, city))
+            return True
+        return False
+
+    try:
+        # Prime the pool up to the in-flight limit
+        while len(pending) < max_workers and submit_next():
+            pass
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                record = future.result()
+                if record["status"] == "ok":
+                    succeeded += 1
+                else:
+                    failed += 1
+
+                # Generator suspends here until the client consumed the record
+                yield record
+                submit_next()
+
+        yield {
+            "status": "done",
+            "total": succeeded + failed,
+            "succeeded": succeeded,
+            "failed": failed,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+
+    finally:
+        # Client disconnected or stream finished: drop queued work
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def format_ndjson(record: dict) -> str:
+    """Serialize a stream record as one NDJSON line"""
+    return json.dumps(record) + "\n"
+
+
+def format_sse(record: dict) -> str:
+    """
+    Serialize a stream record as a Server-Sent Event
+
+    Event names: ``prediction`` (ok), ``error`` (failed city), ``done`` (summary)
+    """
+    status = record.get("status")
+    if status == "ok":
+        event = "prediction"
+    elif status == "done":
+        event = "done"
+    else:
+        event = "error"
+    return f"event: {event}\ndata: {json.dumps(record)}\n\n"
+
+
+def stream_fleet_predictions(cities: list, fmt: str = "ndjson", max_workers: int = STREAM_MAX_WORKERS):
+    """
+    Public interface to stream fleet predictions as encoded text chunks
+
+    Args:
+        cities (list): City names to process
+        fmt (str): Output format ('ndjson' or 'sse')
+        max_workers (int): Maximum number of concurrent city pipelines
+
+    Yields:
+        str: Encoded record
+    """
+    formatter = format_sse if fmt == "sse" else format_ndjson
+    for record in iter_fleet_predictions(cities, max_workers=max_workers):
+        yield formatter(record)
@@ -8,12 +8,14 @@ from datetime import datetime
 from config import WEATHER_API_KEY, WEATHER_API_URL
 
 
-def fetch_weather_data(city: str) -> dict:
+def fetch_weather_data(city: str, query: str = None, location_id: str = None) -> dict:
     """
     Fetch current weather data for a given city
     
     Args:
         city (str): Name of the city
+        query (str): WeatherAPI query to send instead of the name (e.g. "lat,lon")
+        location_id (str): Canonical gazetteer ID, passed through as metadata
         
     Returns:
         dict: Weather data with features required for ML models
@@ -25,7 +27,7 @@ def fetch_weather_data(city: str) -> dict:
         # Prepare API request
         params = {
             "key": WEATHER_API_KEY,
-            "q": city,
+            "q": query or city,
             "aqi": "no"  # We don't need air quality data
         }
         
@@ -71,6 +73,7 @@ def fetch_weather_data(city: str) -> dict:
             
             # Additional metadata
             "city": city,
+            "location_id": location_id,
             "timestamp": now.isoformat()
         }
         
@@ -99,14 +102,16 @@ def fetch_weather_data(city: str) -> dict:
         raise Exception(f"Weather service error: {str(e)}")
 
 
-def get_weather_features(city: str) -> dict:
+def get_weather_features(city: str, query: str = None, location_id: str = None) -> dict:
     """
     Public interface to get weather features for predictions
     
     Args:
         city (str): Name of the city
+        query (str): Optional WeatherAPI query (resolved coordinates)
+        location_id (str): Optional canonical gazetteer ID
         
     Returns:
         dict: Weather features ready for ML model input
     """
-    return fetch_weather_data(city)
+    return fetch_weather_data(city, query=query, location_id=location_id)
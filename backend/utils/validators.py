@@ -3,7 +3,9 @@ Input Validation Utilities
 Validates API inputs and parameters
 """
 
+import hmac
 from flask import jsonify
+from config import STREAM_MAX_CITIES, ADMIN_TOKEN, PROFILE_MAX_SECONDS
 
 
 def validate_city_parameter(city: str) -> tuple:
@@ -43,6 +45,92 @@ def validate_city_parameter(city: str) -> tuple:
     return True, None
 
 
+def validate_city_list(cities: list) -> tuple:
+    """
+    Validate list of cities for streaming requests
+    
+    Args:
+        cities (list): City names parsed from request parameters
+        
+    Returns:
+        tuple: (is_valid: bool, error_response: dict or None)
+    """
+    if not cities:
+        return False, {
+            "error": "Missing required parameter",
+            "message": "At least one city is required. Usage: /predict/stream?cities=<city1>,<city2>"
+        }
+    
+    if len(cities) > STREAM_MAX_CITIES:
+        return False, {
+            "error": "Invalid parameter value",
+            "message": f"Too many cities (max {STREAM_MAX_CITIES} per request)"
+        }
+    
+    return True, None
+
+
+def validate_admin_token(token: str) -> tuple:
+    """
+    Validate admin token for profiling endpoints
+    
+    Args:
+        token (str): Token from the X-Admin-Token header
+        
+    Returns:
+        tuple: (is_valid: bool, error_response: dict or None)
+    """
+    if not ADMIN_TOKEN:
+        return False, {
+            "error": "Forbidden",
+            "message": "Admin endpoints are disabled. Set ADMIN_TOKEN to enable profiling."
+        }
+    
+    # Compare bytes: compare_digest raises TypeError on non-ASCII str
+    if not token or not hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        return False, {
+            "error": "Forbidden",
+            "message": "Invalid or missing admin token"
+        }
+    
+    return True, None
+
+
+def validate_profile_parameters(seconds: str, interval_ms: str) -> tuple:
+    """
+    Validate sampling profile parameters
+    
+    Args:
+        seconds (str): Capture duration from request
+        interval_ms (str): Sampling interval from request
+        
+    Returns:
+        tuple: (is_valid: bool, error_response: dict or None)
+    """
+    try:
+        seconds = float(seconds)
+        interval_ms = float(interval_ms)
+    except (TypeError, ValueError):
+        return False, {
+            "error": "Invalid parameter type",
+            "message": "seconds and interval_ms must be numbers"
+        }
+    
+    if not 0 < seconds <= PROFILE_MAX_SECONDS:
+        return False, {
+            "error": "Invalid parameter value",
+            "message": f"seconds must be between 0 and {PROFILE_MAX_SECONDS}"
+        }
+    
+    if not 1 <= interval_ms <= 1000:
+        return False, {
+            "error": "Invalid parameter value",
+            "message": "interval_ms must be between 1 and 1000"
+        }
+    
+    return True, None
+
+
 def create_error_response(error_type: str, message: str, status_code: int = 400):
     """
     Create standardized error response
@@ -51,4 +51,56 @@ export const fetchPrediction = async (city) => {
   }
 }
 
+/**
+ * Stream energy predictions for many cities (NDJSON)
+ * Each city's result is delivered as soon as the backend has it.
+ * @param {string[]} cities - Names of the cities
+ * @param {(record: Object) => void} onRecord - Called once per streamed record
+ * @returns {Promise<Object>} - Final summary record
+ */
+export const streamPredictions = async (cities, onRecord) => {
+  // Repeated `city` keeps state-qualified names ("Aurangabad, Bihar") intact
+  const params = new URLSearchParams(cities.map((city) => ['city', city]))
+  params.set('format', 'ndjson')
+
+  let response
+  try {
+    response = await fetch(`${API_BASE_URL}/predict/stream?${params}`)
+  } catch (error) {
+    throw new Error('Backend server is unavailable. Please ensure Flask app is running.')
+  }
+
+  if (!response.ok) {
+    const data = await response.json().catch(() => ({}))
+    throw new Error(data.message || data.error || 'Server error occurred')
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  let summary = null
+
+  const handleLine = (line) => {
+    if (!line.trim()) return
+    const record = JSON.parse(line)
+    if (record.status === 'done') {
+      summary = record
+    } else {
+      onRecord(record)
+    }
+  }
+
+  while (true) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+    const lines = buffer.split('\n')
+    buffer = lines.pop()
+    lines.forEach(handleLine)
+  }
+  handleLine(buffer)
+
+  return summary
+}
+
 export default api